@@ -0,0 +1,64 @@
+"""Measure SnapshotExporter throughput in rows per second for each format
+
+    python benchmarks/bench_export.py [--rows 1000000]
+"""
+import argparse
+import importlib
+import itertools
+import os
+import sys
+import tempfile
+import time
+import types
+
+# process_widget imports Windows-only modules at the top; the exporter doesn't
+# use them, so stub whatever is missing to run this anywhere.
+for name in ['win32gui', 'win32con', 'win32api', 'win32process', 'win32ui', 'winreg',
+             'win32com', 'win32com.client', 'pystray', 'PIL', 'PIL.Image', 'PIL.ImageTk']:
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        sys.modules[name] = types.ModuleType(name)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from process_widget import SnapshotExporter
+
+
+def synthetic_rows(count, processes=1000):
+    """Lazily yield rows shaped like a 1 Hz recording of `processes` processes"""
+    start = time.time()
+    for i in range(count):
+        pid = i % processes
+        yield (
+            round(start + i // processes, 3),
+            pid,
+            pid // 10,
+            f"process{pid}.exe",
+            f"C:\\Program Files\\App{pid}\\process{pid}.exe",
+            10_000_000 + pid * 4096,
+            i * 0.001,
+            i * 0.0005,
+            i * 512,
+            i * 256,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    exporter = SnapshotExporter()
+    with tempfile.TemporaryDirectory() as directory:
+        for ext in ('.csv', '.ndjson', '.pmcol'):
+            path = os.path.join(directory, 'export' + ext)
+            start = time.perf_counter()
+            count = exporter.export(synthetic_rows(args.rows), path)
+            elapsed = time.perf_counter() - start
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            print(f"{ext:8} {count} rows in {elapsed:.2f}s  "
+                  f"{count / elapsed:,.0f} rows/s  {size_mb:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
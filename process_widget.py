@@ -16,6 +16,474 @@ import winreg
 import win32com.client
 from pathlib import Path
 import pystray
+import tempfile
+import csv
+import itertools
+import argparse
+import signal
+from tkinter import filedialog
+import cProfile
+import contextlib
+import logging
+from collections import deque
+
+logger = logging.getLogger('ProcessMonitor')
+
+class SettingsStore:
+    """Hold settings in memory and write them to disk in the background"""
+
+    def __init__(self, path, delay=0.5):
+        self.path = path
+        self.delay = delay
+        self.pending = None
+        self.deadline = 0.0
+        # Bumped on every change so a write of older settings can be skipped
+        self.generation = 0
+        self.cond = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.writer = None
+
+    def update(self, settings):
+        """Queue settings for saving, restarting the debounce delay"""
+        with self.cond:
+            self.pending = dict(settings)
+            self.generation += 1
+            self.deadline = time.monotonic() + self.delay
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.run)
+                self.writer.daemon = True
+                self.writer.start()
+            self.cond.notify()
+
+    def run(self):
+        """Writer thread body, saves pending settings once changes stop"""
+        while True:
+            with self.cond:
+                while self.pending is None or time.monotonic() < self.deadline:
+                    if self.pending is None:
+                        self.cond.wait()
+                    else:
+                        self.cond.wait(self.deadline - time.monotonic())
+                settings, generation, self.pending = self.pending, self.generation, None
+            self.write(settings, generation)
+
+    def flush(self):
+        """Write any pending settings now"""
+        with self.cond:
+            settings, generation, self.pending = self.pending, self.generation, None
+        if settings is not None:
+            self.write(settings, generation)
+
+    def discard(self):
+        """Drop pending settings and wait out any write in progress"""
+        with self.cond:
+            self.pending = None
+            self.generation += 1
+        # Once the lock is free no older write can still land on disk
+        with self.write_lock:
+            pass
+
+    def write(self, settings, generation):
+        """Write settings to a temp file and rename it over the real one"""
+        directory = os.path.dirname(self.path)
+        with self.write_lock:
+            with self.cond:
+                if generation != self.generation:
+                    return
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.settings-', suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        json.dump(settings, f)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, self.path)
+                except Exception:
+                    os.remove(tmp_path)
+                    raise
+            except Exception as e:
+                print(f"Error saving settings: {e}")
+
+class ProcessPool:
+    """Keep psutil.Process handles alive between ticks, keyed by PID"""
+
+    # Attributes read for every process, batched through Process.oneshot()
+    SAMPLE_ATTRS = ['name', 'exe', 'memory_info', 'cpu_times', 'ppid']
+    if hasattr(psutil.Process, 'io_counters'):
+        SAMPLE_ATTRS.append('io_counters')
+
+    def __init__(self):
+        self.handles = {}
+        self.info = {}
+        self.lock = threading.Lock()
+
+    def reconcile(self):
+        """Sync the pool with the live PID list
+
+        Returns the current PIDs and the PIDs whose handle was replaced
+        because the process exited and the PID was reused.
+        """
+        pids = set(psutil.pids())
+        replaced = set()
+        with self.lock:
+            # Forget processes that have exited
+            for pid in list(self.handles):
+                if pid not in pids:
+                    self.discard(pid)
+
+            for pid in pids:
+                handle = self.handles.get(pid)
+                # is_running() compares create times, so a reused PID gets a fresh handle
+                if handle is not None and handle.is_running():
+                    continue
+                if handle is not None:
+                    replaced.add(pid)
+                self.info.pop(pid, None)
+                try:
+                    self.handles[pid] = psutil.Process(pid)
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    self.handles.pop(pid, None)
+        return pids, replaced
+
+    def discard(self, pid):
+        """Drop the handle and cached attributes for a PID"""
+        self.handles.pop(pid, None)
+        self.info.pop(pid, None)
+
+    def cached(self, pid):
+        """Return the attributes read for a PID by the last sample, or None"""
+        with self.lock:
+            return self.info.get(pid)
+
+    def get(self, pid):
+        """Return the pooled handle for a PID, creating it if needed"""
+        with self.lock:
+            handle = self.handles.get(pid)
+            if handle is None:
+                try:
+                    handle = psutil.Process(pid)
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    return None
+                self.handles[pid] = handle
+            return handle
+
+    def sample(self):
+        """Read attributes for every pooled process and return them as dicts"""
+        with self.lock:
+            handles = list(self.handles.items())
+
+        samples = []
+        for pid, handle in handles:
+            try:
+                # as_dict() wraps the reads in oneshot(), so each process is read once
+                info = handle.as_dict(attrs=self.SAMPLE_ATTRS, ad_value=None)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                with self.lock:
+                    self.discard(pid)
+                continue
+            info['pid'] = pid
+            with self.lock:
+                self.info[pid] = info
+            samples.append(info)
+        return samples
+
+class MemoryDetailSampler:
+    """Read expensive memory details for one PID on a worker thread"""
+
+    def __init__(self, ttl=3.0, top_maps=5):
+        self.ttl = ttl
+        self.top_maps = top_maps
+        self.cache = {}
+        self.cancel_event = None
+        # Latest request waiting for the worker, older ones are simply replaced
+        self.queued = None
+        self.busy = False
+        self.lock = threading.Lock()
+
+    def request(self, pid, handle, callback):
+        """Sample details for a PID, cancelling any sample still running"""
+        self.cancel()
+
+        with self.lock:
+            cached = self.cache.get(pid)
+        if cached and time.monotonic() - cached[0] < self.ttl:
+            callback(pid, cached[1])
+            return
+
+        cancel_event = threading.Event()
+        job = (pid, handle, callback, cancel_event)
+        with self.lock:
+            self.cancel_event = cancel_event
+            # Only one sample runs at a time, the worker picks this up when it finishes
+            if self.busy:
+                self.queued = job
+                return
+            self.busy = True
+        worker = threading.Thread(target=self.work, args=(job,))
+        worker.daemon = True
+        worker.start()
+
+    def forget(self, pid):
+        """Drop cached details for a PID"""
+        with self.lock:
+            self.cache.pop(pid, None)
+
+    def cancel(self):
+        """Stop reporting the sample currently in progress"""
+        with self.lock:
+            if self.cancel_event is not None:
+                self.cancel_event.set()
+                self.cancel_event = None
+            self.queued = None
+
+    def work(self, job):
+        """Worker thread body, runs queued samples until none are left"""
+        while job is not None:
+            try:
+                self.run(*job)
+            except Exception:
+                # Keep the worker going so later selections are still sampled
+                logger.exception("Memory detail sample failed for PID %s", job[0])
+            with self.lock:
+                job, self.queued = self.queued, None
+                if job is None:
+                    self.busy = False
+
+    def read(self, func, *args, **kwargs):
+        """Call a psutil method, returning None if access is denied"""
+        try:
+            return func(*args, **kwargs)
+        except (psutil.AccessDenied, NotImplementedError):
+            return None
+
+    def run(self, pid, handle, callback, cancel_event):
+        """Sample one PID, checking for cancellation between each read"""
+        if cancel_event.is_set():
+            return
+        try:
+            details = {}
+            mem = self.read(handle.memory_full_info)
+            details['uss'] = getattr(mem, 'uss', None)
+            details['pss'] = getattr(mem, 'pss', None)
+            details['swap'] = getattr(mem, 'swap', None)
+            details['page_faults'] = getattr(mem, 'num_page_faults', None)
+            if cancel_event.is_set():
+                return
+
+            if hasattr(handle, 'num_handles'):
+                details['handles'] = self.read(handle.num_handles)
+            elif hasattr(handle, 'num_fds'):
+                details['handles'] = self.read(handle.num_fds)
+            else:
+                details['handles'] = None
+            open_files = self.read(handle.open_files)
+            details['open_files'] = None if open_files is None else len(open_files)
+            if cancel_event.is_set():
+                return
+
+            maps = self.read(handle.memory_maps, grouped=True) or []
+            maps.sort(key=lambda m: m.rss, reverse=True)
+            details['maps'] = [(os.path.basename(m.path) or m.path, m.rss) for m in maps[:self.top_maps]]
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            details = None
+
+        if cancel_event.is_set():
+            return
+        if details is not None:
+            with self.lock:
+                self.cache[pid] = (time.monotonic(), details)
+        callback(pid, details)
+
+class ScanProfiler:
+    """Collect rolling timings and counters for the widget's own work"""
+
+    # Shared no-op context so disabled stages cost a single attribute check
+    NULL_STAGE = contextlib.nullcontext()
+
+    # Samples recorded in seconds and shown in milliseconds
+    TIMED = ('enumerate', 'diff', 'sample', 'sort', 'render', 'icons', 'monitor_cpu', 'event_lag')
+    # Samples recorded as plain counts
+    COUNTED = ('rows', 'icon_extractions')
+
+    def __init__(self, window=100):
+        self.enabled = False
+        self.window = window
+        self.samples = {}
+        self.lock = threading.Lock()
+        self.profile = None
+        self.profile_ticks = 0
+        self.profile_path = None
+        self.profile_callback = None
+
+    def stage(self, name):
+        """Time a block as the given stage when profiling is enabled"""
+        if not self.enabled:
+            return self.NULL_STAGE
+        return self.timed(name)
+
+    @contextlib.contextmanager
+    def timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, value):
+        """Add one sample to a stage's rolling window"""
+        with self.lock:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+            self.samples[name].append(value)
+
+    def percentiles(self, name):
+        """Return (p50, p95) for a stage, or None without samples"""
+        with self.lock:
+            values = sorted(self.samples.get(name, ()))
+        if not values:
+            return None
+        return values[len(values) // 2], values[min(len(values) - 1, int(len(values) * 0.95))]
+
+    def summary(self):
+        """Format the current percentiles as a single status line"""
+        parts = []
+        for name in self.TIMED + self.COUNTED:
+            stats = self.percentiles(name)
+            if stats is None:
+                continue
+            if name in self.TIMED:
+                parts.append(f"{name} {stats[0] * 1000:.1f}/{stats[1] * 1000:.1f}ms")
+            else:
+                parts.append(f"{name} {stats[0]:.0f}/{stats[1]:.0f}")
+        return "p50/p95  " + "  ".join(parts) if parts else "Collecting samples..."
+
+    def capture(self, ticks, path, callback):
+        """Record a cProfile capture of the next N scans and dump it to path"""
+        self.profile = cProfile.Profile()
+        self.profile_ticks = ticks
+        self.profile_path = path
+        self.profile_callback = callback
+
+    def begin_tick(self):
+        if self.profile is not None:
+            self.profile.enable()
+
+    def end_tick(self):
+        if self.profile is None:
+            return
+        self.profile.disable()
+        self.profile_ticks -= 1
+        if self.profile_ticks <= 0:
+            profile, self.profile = self.profile, None
+            profile.dump_stats(self.profile_path)
+            self.profile_callback(self.profile_path)
+
+class SnapshotExporter:
+    """Stream process rows to CSV, NDJSON or a columnar file in large chunks"""
+
+    COLUMNS = ('timestamp', 'pid', 'ppid', 'name', 'exe', 'rss',
+               'cpu_user', 'cpu_system', 'read_bytes', 'write_bytes')
+    FORMATS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson', '.pmcol': 'columnar'}
+
+    def __init__(self, chunk_rows=10000, buffer_size=1024 * 1024):
+        self.chunk_rows = chunk_rows
+        self.buffer_size = buffer_size
+
+    @classmethod
+    def format_for(cls, path):
+        """Pick an export format from the file extension"""
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in cls.FORMATS:
+            raise ValueError(f"Unsupported export format: {ext or path}")
+        return cls.FORMATS[ext]
+
+    @classmethod
+    def rows_from_samples(cls, samples, timestamp=None):
+        """Lazily turn ProcessPool samples into export rows"""
+        if timestamp is None:
+            timestamp = time.time()
+        for info in samples:
+            mem = info.get('memory_info')
+            cpu = info.get('cpu_times')
+            io = info.get('io_counters')
+            yield (
+                round(timestamp, 3),
+                info['pid'],
+                info.get('ppid'),
+                info.get('name'),
+                info.get('exe'),
+                mem.rss if mem else None,
+                cpu.user if cpu else None,
+                cpu.system if cpu else None,
+                io.read_bytes if io else None,
+                io.write_bytes if io else None,
+            )
+
+    @classmethod
+    def record(cls, pool, interval, duration, stop=None):
+        """Lazily sample the pool every interval seconds for duration seconds
+
+        Setting the optional stop event ends the recording early as a normal
+        end of stream, so the rows already sampled are still written.
+        """
+        stop = stop or threading.Event()
+        end = time.monotonic() + duration
+        while not stop.is_set():
+            tick = time.monotonic()
+            pool.reconcile()
+            yield from cls.rows_from_samples(pool.sample())
+            if tick + interval >= end:
+                break
+            stop.wait(max(0.0, tick + interval - time.monotonic()))
+
+    def chunks(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_rows))
+            if not chunk:
+                return
+            yield chunk
+
+    def export(self, rows, path, fmt=None):
+        """Write rows to path and return the number of rows written"""
+        fmt = fmt or self.format_for(path)
+        writer = getattr(self, f"write_{fmt}")
+        tmp_path = path + '.part'
+        try:
+            with open(tmp_path, 'w', newline='', encoding='utf-8', buffering=self.buffer_size) as f:
+                count = writer(rows, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return count
+
+    def write_csv(self, rows, f):
+        writer = csv.writer(f)
+        writer.writerow(self.COLUMNS)
+        count = 0
+        for chunk in self.chunks(rows):
+            writer.writerows(chunk)
+            count += len(chunk)
+        return count
+
+    def write_ndjson(self, rows, f):
+        count = 0
+        for chunk in self.chunks(rows):
+            f.write(''.join(json.dumps(dict(zip(self.COLUMNS, row))) + '\n' for row in chunk))
+            count += len(chunk)
+        return count
+
+    def write_columnar(self, rows, f):
+        # Header line with the schema, then one line per row group holding one array per column
+        f.write(json.dumps({'format': 'pmcol', 'version': 1, 'columns': self.COLUMNS}) + '\n')
+        count = 0
+        for chunk in self.chunks(rows):
+            f.write(json.dumps({'rows': len(chunk), 'data': [list(col) for col in zip(*chunk)]},
+                               separators=(',', ':')) + '\n')
+            count += len(chunk)
+        return count
 
 class ProcessWidget(tk.Tk):
     def __init__(self):
@@ -37,6 +505,9 @@ class ProcessWidget(tk.Tk):
         
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
+
+        # Debounced writer so slider drags and window moves don't hit the disk each time
+        self.settings_store = SettingsStore(self.settings_file)
         
         # Initialize default settings
         self.position_locked = tk.BooleanVar(value=False)
@@ -103,6 +574,9 @@ class ProcessWidget(tk.Tk):
         # Store icons cache
         self.icon_cache = {}
 
+        # Shared process handles for scanning, icons and terminate actions
+        self.process_pool = ProcessPool()
+
         # Create treeview with adjusted height and selection colors
         self.tree = ttk.Treeview(self.main_frame, columns=('Name', 'PID', 'Memory'), height=15,
                                  selectmode="browse")
@@ -132,6 +606,25 @@ class ProcessWidget(tk.Tk):
         scrollbar.grid(row=0, column=2, sticky=(tk.N, tk.S), padx=(0, 2))
         self.tree.configure(yscrollcommand=scrollbar.set)
 
+        # Memory detail pane, shown when a row is selected
+        self.detail_label = ttk.Label(self.main_frame, text="", style="Main.TLabel",
+                                      justify=tk.LEFT, font=('Consolas', 9))
+        self.detail_label.grid(row=2, column=0, columnspan=3, sticky="w", padx=2)
+        self.detail_label.grid_remove()
+        self.memory_sampler = MemoryDetailSampler()
+        self.detail_pid = None
+        self.detail_refresh_id = None
+        self.tree.bind('<<TreeviewSelect>>', self.on_process_select)
+
+        # Profiler status bar, shown from the context menu
+        self.profiler = ScanProfiler()
+        self.profiler_visible = tk.BooleanVar(value=False)
+        self.profiler_label = ttk.Label(self.main_frame, text="", style="Main.TLabel",
+                                        font=('Consolas', 8))
+        self.profiler_label.grid(row=3, column=0, columnspan=3, sticky="w", padx=2)
+        self.profiler_label.grid_remove()
+        self.lag_probe_id = None
+
         # Store current processes
         self.current_processes = set()
 
@@ -216,9 +709,9 @@ class ProcessWidget(tk.Tk):
 
     def initial_scan(self):
         """Perform initial scan of processes"""
-        self.single_scan()
         # Store current PIDs
-        self.current_processes = set(proc.pid for proc in psutil.process_iter())
+        self.current_processes, replaced = self.process_pool.reconcile()
+        self.single_scan(replaced)
 
     def start_process_monitor(self):
         """Start the background monitoring thread"""
@@ -230,15 +723,23 @@ class ProcessWidget(tk.Tk):
         """Monitor for new processes in the background"""
         while self.running:
             try:
+                cpu_start = time.thread_time()
+
                 # Get current set of processes
-                new_processes = set(proc.pid for proc in psutil.process_iter())
+                with self.profiler.stage('enumerate'):
+                    new_processes, replaced = self.process_pool.reconcile()
 
                 # Check if there are any changes
-                if new_processes != self.current_processes:
+                with self.profiler.stage('diff'):
+                    changed = new_processes != self.current_processes or replaced
+                if changed:
                     # Update the process list
                     self.current_processes = new_processes
                     # Schedule the update in the main thread
-                    self.after(0, self.single_scan)
+                    self.after(0, self.single_scan, replaced)
+
+                if self.profiler.enabled:
+                    self.profiler.record('monitor_cpu', time.thread_time() - cpu_start)
 
                 # Sleep for a short time before next check
                 time.sleep(1)
@@ -253,14 +754,21 @@ class ProcessWidget(tk.Tk):
             if pid in self.icon_cache:
                 return self.icon_cache[pid]
 
-            # Try to get process path
-            process = psutil.Process(pid)
-            try:
-                exe_path = process.exe()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                return self.get_default_icon(process_name)
+            # Try to get process path, preferring the value read by the last scan
+            # A None exe means that read was denied, so don't retry it here
+            sampled = self.process_pool.cached(pid)
+            if sampled is not None:
+                exe_path = sampled['exe']
+            else:
+                process = self.process_pool.get(pid)
+                if process is None:
+                    return self.get_default_icon(process_name)
+                try:
+                    exe_path = process.exe()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    return self.get_default_icon(process_name)
 
-            if not os.path.exists(exe_path):
+            if not exe_path or not os.path.exists(exe_path):
                 return self.get_default_icon(process_name)
 
             # Extract icon - use large icons for better quality
@@ -392,50 +900,228 @@ class ProcessWidget(tk.Tk):
             photo = ImageTk.PhotoImage(img)
             return photo
 
-    def single_scan(self):
+    def single_scan(self, replaced=()):
         """Scan and update the process list"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.profiler.begin_tick()
+        try:
+            self.scan_and_render(replaced)
+        finally:
+            self.profiler.end_tick()
+
+        if self.profiler.enabled:
+            self.update_profiler_status()
+
+    def scan_and_render(self, replaced=()):
+        """Sample processes and rebuild the treeview rows"""
+        profiling = self.profiler.enabled
+
+        # A reused PID belongs to a different program, so drop what was cached for the old one
+        for pid in replaced:
+            self.icon_cache.pop(pid, None)
+            self.memory_sampler.forget(pid)
 
         # Get and sort processes
         processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'memory_info']):
-            try:
-                process_info = proc.info
+        with self.profiler.stage('sample'):
+            for process_info in self.process_pool.sample():
+                if process_info['memory_info'] is None:
+                    continue
                 memory_mb = process_info['memory_info'].rss / (1024 * 1024)
                 processes.append((process_info['name'], process_info['pid'], memory_mb))
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
+
+        # Drop icons for processes that have exited
+        live_pids = set(pid for _, pid, _ in processes)
+        for pid in list(self.icon_cache):
+            if pid not in live_pids:
+                del self.icon_cache[pid]
 
         # Sort by memory usage (descending)
-        processes.sort(key=lambda x: x[2], reverse=True)
+        with self.profiler.stage('sort'):
+            processes.sort(key=lambda x: x[2], reverse=True)
+
+        render_start = time.perf_counter()
+        icon_time = 0.0
+        icon_extractions = 0
+
+        # Clear existing items
+        for item in self.tree.get_children():
+            self.tree.delete(item)
 
         # Update treeview
         for name, pid, memory in processes:
             try:
+                if profiling:
+                    icon_start = time.perf_counter()
+                    icon_extractions += pid not in self.icon_cache
                 icon = self.get_process_icon(name, pid)
+                if profiling:
+                    icon_time += time.perf_counter() - icon_start
                 item_id = self.tree.insert('', 'end', text='')  # Create item without values first
                 if icon:
                     self.tree.item(item_id, image=icon)  # Set icon separately
                 self.tree.set(item_id, 'Name', name)  # Set each column value separately
                 self.tree.set(item_id, 'PID', str(pid))
                 self.tree.set(item_id, 'Memory', f"{memory:.1f}")
+                # Keep the row with the open detail pane selected across rescans
+                if pid == self.detail_pid:
+                    self.tree.selection_set(item_id)
             except Exception as e:
                 continue  # Skip any problematic entries
 
+        if profiling:
+            self.profiler.record('render', time.perf_counter() - render_start - icon_time)
+            self.profiler.record('icons', icon_time)
+            self.profiler.record('rows', len(processes))
+            self.profiler.record('icon_extractions', icon_extractions)
+
+    def on_process_select(self, event):
+        """Start sampling memory details for the selected process"""
+        selected_item = self.tree.selection()
+        if not selected_item:
+            self.stop_memory_details()
+            return
+
+        pid = int(self.tree.item(selected_item)['values'][1])
+        if pid == self.detail_pid:
+            return
+        self.stop_memory_details()
+        self.detail_pid = pid
+
+        self.detail_label.configure(text=f"PID {pid}: loading memory details...")
+        self.detail_label.grid()
+        self.request_memory_details()
+
+    def request_memory_details(self):
+        """Sample the selected process and schedule the next refresh"""
+        self.detail_refresh_id = None
+        pid = self.detail_pid
+        if pid is None:
+            return
+
+        process = self.process_pool.get(pid)
+        if process is None:
+            self.stop_memory_details()
+            return
+
+        self.memory_sampler.request(
+            pid, process,
+            lambda pid, details: self.after(0, self.show_memory_details, pid, details)
+        )
+        # Resample just after the cached details expire so the numbers stay live
+        self.detail_refresh_id = self.after(int(self.memory_sampler.ttl * 1000) + 500,
+                                            self.request_memory_details)
+
+    def stop_memory_details(self):
+        """Hide the detail pane and stop sampling"""
+        self.memory_sampler.cancel()
+        if self.detail_refresh_id is not None:
+            self.after_cancel(self.detail_refresh_id)
+            self.detail_refresh_id = None
+        self.detail_pid = None
+        self.detail_label.grid_remove()
+
+    def show_memory_details(self, pid, details):
+        """Render sampled memory details if the PID is still selected"""
+        if pid != self.detail_pid:
+            return
+        if details is None:
+            self.detail_label.configure(text=f"PID {pid}: process has exited")
+            return
+
+        def mb(value):
+            return "n/a" if value is None else f"{value / (1024 * 1024):.1f} MB"
+
+        def count(value):
+            return "n/a" if value is None else str(value)
+
+        lines = [
+            f"USS {mb(details['uss'])}   PSS {mb(details['pss'])}   Swap {mb(details['swap'])}",
+            f"Page faults {count(details['page_faults'])}   Handles {count(details['handles'])}"
+            f"   Open files {count(details['open_files'])}",
+        ]
+        for path, rss in details['maps']:
+            lines.append(f"  {mb(rss):>10}  {path}")
+        self.detail_label.configure(text="\n".join(lines))
+
+    def toggle_profiler(self):
+        """Show or hide the profiler status bar"""
+        self.profiler.enabled = self.profiler_visible.get()
+        if self.profiler.enabled:
+            self.profiler_label.configure(text=self.profiler.summary())
+            self.profiler_label.grid()
+            if self.lag_probe_id is None:
+                self.probe_event_lag()
+        else:
+            self.profiler_label.grid_remove()
+            # Stop the probe chain so re-enabling doesn't start a second one
+            if self.lag_probe_id is not None:
+                self.after_cancel(self.lag_probe_id)
+                self.lag_probe_id = None
+
+    def probe_event_lag(self, expected=None):
+        """Measure how late Tk runs a scheduled callback"""
+        self.lag_probe_id = None
+        if not self.profiler.enabled:
+            return
+        if expected is not None:
+            self.profiler.record('event_lag', max(0.0, time.perf_counter() - expected))
+            self.update_profiler_status()
+        self.lag_probe_id = self.after(1000, self.probe_event_lag, time.perf_counter() + 1.0)
+
+    def update_profiler_status(self):
+        """Refresh the profiler status bar and debug log"""
+        summary = self.profiler.summary()
+        self.profiler_label.configure(text=summary)
+        logger.debug(summary)
+
+    def capture_profile(self, ticks=10):
+        """Capture a cProfile dump of the next scans"""
+        path = os.path.join(os.path.dirname(self.settings_file),
+                            f"profile-{time.strftime('%Y%m%d-%H%M%S')}.pstats")
+        self.profiler.capture(ticks, path, lambda path: messagebox.showinfo(
+            "Profile Saved", f"Profile of {ticks} scans saved to:\n{path}"))
+        # Start the capture right away rather than waiting for a process change
+        self.single_scan()
+
+    def export_snapshot(self):
+        """Ask for a file and export the current processes on a worker thread"""
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Export Processes",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("NDJSON", "*.ndjson"), ("Columnar", "*.pmcol")]
+        )
+        if not path:
+            return
+
+        def run():
+            try:
+                exporter = SnapshotExporter()
+                count = exporter.export(exporter.rows_from_samples(self.process_pool.sample()), path)
+                self.after(0, lambda: messagebox.showinfo(
+                    "Export Complete", f"Exported {count} processes to:\n{path}"))
+            except Exception as e:
+                self.after(0, messagebox.showerror, "Error", f"Export failed: {e}")
+
+        export_thread = threading.Thread(target=run)
+        export_thread.daemon = True
+        export_thread.start()
+
     def refresh_processes(self):
         """Manual refresh button handler"""
-        self.single_scan()
         # Update current processes set
-        self.current_processes = set(proc.pid for proc in psutil.process_iter())
+        self.current_processes, replaced = self.process_pool.reconcile()
+        self.single_scan(replaced)
 
     def end_process(self):
         selected_item = self.tree.selection()
         if selected_item:
             pid = int(self.tree.item(selected_item)['values'][1])  # PID is now the second column
+            process = self.process_pool.get(pid)
+            if process is None:
+                return
             try:
-                psutil.Process(pid).terminate()
+                process.terminate()
             except psutil.NoSuchProcess:
                 pass
             except psutil.AccessDenied:
@@ -444,7 +1130,9 @@ class ProcessWidget(tk.Tk):
     def on_closing(self):
         """Save settings before closing"""
         self.save_settings()
+        self.settings_store.flush()
         self.running = False
+        self.stop_memory_details()
         self.icon_cache.clear()
         self.destroy()
 
@@ -566,7 +1254,7 @@ class ProcessWidget(tk.Tk):
                 self.save_settings()  # Save when position is locked
 
     def save_settings(self):
-        """Save current settings to file"""
+        """Queue current settings to be saved to file"""
         settings = {
             'position_locked': self.position_locked.get(),
             'transparency': self.transparency_var.get(),
@@ -576,12 +1264,8 @@ class ProcessWidget(tk.Tk):
                 'y': self.winfo_y()
             } if self.position_locked.get() else None
         }
-        
-        try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(settings, f)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+
+        self.settings_store.update(settings)
 
     def load_settings(self):
         """Load settings from file"""
@@ -676,7 +1360,8 @@ class ProcessWidget(tk.Tk):
                 except Exception:
                     pass
             
-            # Delete settings file
+            # Delete settings file, dropping any write still waiting
+            self.settings_store.discard()
             try:
                 if os.path.exists(self.settings_file):
                     os.remove(self.settings_file)
@@ -728,6 +1413,11 @@ class ProcessWidget(tk.Tk):
         """Show context menu on right click"""
         menu = tk.Menu(self, tearoff=0)
         menu.add_command(label="Minimize", command=self.minimize_window)
+        menu.add_command(label="Export...", command=self.export_snapshot)
+        menu.add_separator()
+        menu.add_checkbutton(label="Show Profiler", variable=self.profiler_visible,
+                             command=self.toggle_profiler)
+        menu.add_command(label="Profile Next 10 Scans", command=self.capture_profile)
         menu.add_separator()
         menu.add_command(label="Exit", command=self.on_closing)
         menu.tk_popup(event.x_root, event.y_root)
@@ -747,7 +1437,59 @@ class ProcessWidget(tk.Tk):
             y = self.winfo_y() + deltay
             self.geometry(f"+{x}+{y}")
 
+def run_headless_export(args):
+    """Export a snapshot or a recorded time range without opening the window"""
+    exporter = SnapshotExporter()
+    pool = ProcessPool()
+    stop = threading.Event()
+    if args.duration:
+        rows = exporter.record(pool, args.interval, args.duration, stop)
+    else:
+        pool.reconcile()
+        rows = exporter.rows_from_samples(pool.sample())
+
+    # Ctrl+C ends a recording early and still writes the file
+    previous_handler = signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    start = time.perf_counter()
+    try:
+        count = exporter.export(rows, args.export, args.format)
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+    elapsed = time.perf_counter() - start
+    print(f"Exported {count} rows to {args.export} in {elapsed:.2f}s")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process Monitor")
+    parser.add_argument('--export', metavar='PATH',
+                        help="write processes to PATH (.csv, .ndjson or .pmcol) and exit")
+    parser.add_argument('--format', choices=['csv', 'ndjson', 'columnar'],
+                        help="override the format picked from the file extension")
+    parser.add_argument('--duration', type=float, default=0,
+                        help="record for this many seconds instead of a single snapshot")
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help="seconds between samples when recording")
+    args = parser.parse_args()
+    if args.export:
+        if not args.format:
+            try:
+                SnapshotExporter.format_for(args.export)
+            except ValueError as e:
+                parser.error(f"{e}, use .csv, .ndjson or .pmcol or pass --format")
+        if args.duration < 0:
+            parser.error("--duration must not be negative")
+        if args.duration and args.interval <= 0:
+            parser.error("--interval must be greater than zero when recording")
+        run_headless_export(args)
+        sys.exit(0)
+
+    # Set PROCESS_MONITOR_DEBUG to log profiler timings to the console
+    debug = bool(os.getenv('PROCESS_MONITOR_DEBUG'))
+    if debug:
+        logging.basicConfig(level=logging.DEBUG, format='%(asctime)s %(message)s')
+
     app = ProcessWidget()
+    if debug:
+        app.profiler_visible.set(True)
+        app.toggle_profiler()
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop() 
\ No newline at end of file
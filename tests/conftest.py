@@ -0,0 +1,22 @@
+import importlib
+import os
+import sys
+import types
+
+# Let process_widget be imported on machines without the Windows-only
+# dependencies; the classes under test don't touch them.
+STUB_MODULES = ['win32gui', 'win32con', 'win32api', 'win32process', 'win32ui',
+                'winreg', 'win32com', 'win32com.client', 'pystray', 'PIL', 'PIL.Image',
+                'PIL.ImageTk']
+
+for name in STUB_MODULES:
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        sys.modules[name] = types.ModuleType(name)
+
+sys.modules['PIL'].Image = sys.modules['PIL.Image']
+sys.modules['PIL'].ImageTk = sys.modules['PIL.ImageTk']
+sys.modules['win32com'].client = sys.modules['win32com.client']
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,67 @@
+import json
+import os
+import time
+
+import process_widget
+from process_widget import SettingsStore
+
+
+def make_store(tmp_path, monkeypatch):
+    """Create a store whose disk writes are counted through os.replace"""
+    writes = []
+    real_replace = os.replace
+
+    def counting_replace(src, dst):
+        writes.append(dst)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(process_widget.os, 'replace', counting_replace)
+    store = SettingsStore(str(tmp_path / 'settings.json'), delay=0.05)
+    return store, writes
+
+
+def wait_for(condition, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        time.sleep(0.01)
+
+
+def test_slider_drag_is_coalesced_into_one_write(tmp_path, monkeypatch):
+    store, writes = make_store(tmp_path, monkeypatch)
+
+    # Simulate 100 slider callbacks arriving faster than the debounce delay
+    for i in range(100):
+        store.update({'transparency': 0.1 + i * 0.009})
+
+    wait_for(lambda: writes)
+    time.sleep(0.2)
+
+    assert len(writes) == 1
+    with open(store.path) as f:
+        assert json.load(f) == {'transparency': 0.1 + 99 * 0.009}
+
+
+def test_flush_writes_once(tmp_path, monkeypatch):
+    store, writes = make_store(tmp_path, monkeypatch)
+    store.delay = 10
+
+    store.update({'transparency': 0.5})
+    store.update({'transparency': 0.6})
+    store.flush()
+    store.flush()
+
+    assert len(writes) == 1
+    with open(store.path) as f:
+        assert json.load(f) == {'transparency': 0.6}
+
+
+def test_discard_suppresses_pending_write(tmp_path, monkeypatch):
+    store, writes = make_store(tmp_path, monkeypatch)
+
+    store.update({'transparency': 0.5})
+    store.discard()
+    store.flush()
+    time.sleep(0.2)
+
+    assert writes == []
+    assert not os.path.exists(store.path)